@@ -3,86 +3,77 @@
 Example usage of the PDF highlight extractor.
 """
 
-from extract_highlights import extract_pdf_highlights
+from collections import defaultdict
+from extract_highlights import iter_pdf_highlights
 import json
-import pandas as pd
+import xlsxwriter
+
+try:
+    import orjson
+except ImportError:  # optional, faster JSON output
+    orjson = None
 
 def main():
     # Path to your PDF file
     pdf_path = "data/tcannex-annotated-NIST.SP.800-63B-4-raw-merged.pdf"
     
-    # Extract highlights
-    highlights = extract_pdf_highlights(pdf_path)
+    annotate_file = pdf_path.replace(".pdf", "").replace('data/tcannex-annotated', '')
+    output_file = f"extracted_highlights_{annotate_file}.json"
+    excel_file = f"extracted_highlights_{annotate_file}.xlsx"
+    
+    # Extract highlights, streaming each row into the Excel file as it comes
+    workbook = xlsxwriter.Workbook(excel_file, {'constant_memory': True})
+    worksheet = workbook.add_worksheet('Highlights')
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+    
+    columns = ('page', 'text', 'annotation_type')
+    worksheet.write_row(0, 0, columns, header_format)
+    max_lengths = [len(column) for column in columns]
+    
+    highlights = []
+    for row, highlight in enumerate(iter_pdf_highlights(pdf_path, include_geometry=False), start=1):
+        values = (highlight.page, highlight.text, highlight.annotation_type)
+        worksheet.write_row(row, 0, values)
+        max_lengths = [max(n, len(str(v))) for n, v in zip(max_lengths, values)]
+        highlights.append(highlight)
+    
+    # Set width with some padding, max 100 characters for text column
+    for i, (column, max_length) in enumerate(zip(columns, max_lengths)):
+        worksheet.set_column(i, i, min(max_length + 2, 100 if column == 'text' else 20))
+    workbook.close()
     
     print(f"Found {len(highlights)} highlighted sections")
     print()
     
     # Group by annotation type
-    by_type = {"Def": [], "FYI": [], "Rec": [], "Err": [], "Ref": []}
+    annotation_types = ("Def", "FYI", "Rec", "Err", "Ref")
+    by_type = defaultdict(list)
     
     for highlight in highlights:
-        ann_type = highlight.get("annotation_type")
-        if ann_type in by_type:
-            by_type[ann_type].append(highlight)
+        by_type[highlight.annotation_type].append(highlight)
     
-    # Show examples of each type
-    for ann_type, items in by_type.items():
-        key = "text"
+    # Show examples of each type, in display order
+    for ann_type in annotation_types:
+        items = by_type.get(ann_type, ())
         if items:
             print(f"=== {ann_type} ({len(items)} items) ===")
             for i, item in enumerate(items[:3]):  # Show first 3 of each type
-                text = item[key][:150] + "..." if len(item[key]) > 150 else item[key]
-                print(f"{i+1}. Page {item['page']}: {text}")
+                text = item.text[:150] + "..." if len(item.text) > 150 else item.text
+                print(f"{i+1}. Page {item.page}: {text}")
             if len(items) > 3:
                 print(f"   ... and {len(items) - 3} more")
             print()
 
-    annotate_file = pdf_path.replace(".pdf", "").replace('data/tcannex-annotated', '')
     # Save to JSON file
-    output_file = f"extracted_highlights_{annotate_file}.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(highlights, f, indent=2, ensure_ascii=False)
+    records = [highlight.to_dict() for highlight in highlights]
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(records, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
     
     print(f"All highlights saved to {output_file}")
-    
-    # Save to Excel file
-    excel_file = f"extracted_highlights_{annotate_file}.xlsx"
-    
-    # Create DataFrame with main components
-    excel_data = []
-    for highlight in highlights:
-        excel_data.append({
-            'page': highlight['page'],
-            'text': highlight['text'],
-            'annotation_type': highlight.get('annotation_type', 'Unknown')
-        })
-    
-    df = pd.DataFrame(excel_data)
-    
-    # Save to Excel with formatting
-    with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Highlights', index=False)
-        
-        # Get the workbook and worksheet objects
-        workbook = writer.book
-        worksheet = writer.sheets['Highlights']
-        
-        # Auto-adjust column widths
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            
-            # Set width with some padding, max 100 characters for text column
-            adjusted_width = min(max_length + 2, 100 if column_letter == 'B' else 20)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-    
     print(f"All highlights saved to Excel: {excel_file}")
     print(f"Excel file contains {len(highlights)} rows with columns: page, text, annotation_type")
 
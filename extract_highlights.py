@@ -6,253 +6,448 @@ This script extracts highlighted text from PDF files based on highlight colors
 and maps them to annotation types (Def, FYI, Rec) as defined in the TCAnnex legend.
 
 Requirements:
-    pip install PyMuPDF
+    Python 3.10+
+    pip install PyMuPDF numpy
 
 Usage:
-    from extract_highlights import extract_pdf_highlights
+    from extract_highlights import extract_pdf_highlights, iter_pdf_highlights
     highlights = extract_pdf_highlights("path/to/pdf/file.pdf")
+
+    # or stream them one at a time
+    for highlight in iter_pdf_highlights("path/to/pdf/file.pdf"):
+        ...
 """
 
 import fitz  # PyMuPDF
+import numpy as np
+import os
 import pymupdf
-from typing import List, Dict, Tuple, Optional
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from multiprocessing import Pool
+from typing import Iterator, List, Dict, NamedTuple, Tuple, Optional
 _threshold_intersection = 0.6  # if the intersection is large enough.
 
+# Color mappings based on TCAnnex annotation types
+# Based on actual colors found in the PDF
+COLOR_MAPPINGS = {
+    # Actual colors from the PDF
+    (1.0, 0.76, 0.0): "FYI",     # Gold/orange - FYI (Other important info) 
+    (0.77, 0.98, 0.45): "Def",   # Light green - Def (Definition)
+    (0.22, 0.9, 1.0): "Rec",     # Light blue - Rec (Recommendation)
+    (1.0, 0.38, 0.0): "Err",   # Red - Err (Error)
+    (0.86, 0.67, 1.0): "Ref",    # Light purple - Ref (Reference to external resource)
+    
+    # Add tolerance variants for similar colors
+    (1.0, 0.75, 0.0): "FYI",     # Gold variant
+    (1.0, 0.77, 0.0): "FYI",     # Gold variant
+    (0.97, 0.39, 0.39): "Err",   # Red variant
+    (0.76, 0.98, 0.45): "Def",   # Green variant
+    (0.78, 0.98, 0.45): "Def",   # Green variant  
+    (0.21, 0.9, 1.0): "Rec",     # Blue variant
+    (0.23, 0.9, 1.0): "Rec",     # Blue variant
+    (0.96, 0.39, 0.39): "Err",   # Red variant
+    (0.98, 0.39, 0.39): "Err",   # Red variant
+    (0.85, 0.67, 1.0): "Ref",    # Purple variant
+    (0.87, 0.67, 1.0): "Ref",    # Purple variant
+}
+
+# Fuzzy color matching is precomputed into a lookup table indexed by the
+# quantized RGB value, so mapping a color is a single array access.
+_LUT_BINS = 32
+_LUT_TOLERANCE = 0.15  # per-channel tolerance of the fuzzy match
+_LUT_UNKNOWN = 255
+_LUT_LABELS = sorted(set(COLOR_MAPPINGS.values()))
+
+
+def _quantize(c: float) -> int:
+    """Quantize a color channel in [0, 1] to a lookup table bin."""
+    return min(max(int(round(c * (_LUT_BINS - 1))), 0), _LUT_BINS - 1)
+
+
+def _build_color_lut() -> np.ndarray:
+    """Build the (bins, bins, bins) table mapping quantized RGB to a label index."""
+    lut = np.full((_LUT_BINS,) * 3, _LUT_UNKNOWN, dtype=np.uint8)
+    steps = int(round(_LUT_TOLERANCE * (_LUT_BINS - 1)))
+
+    # Exact colors first, so they win over a neighbour's tolerance cube.
+    for mapped_color, annotation_type in COLOR_MAPPINGS.items():
+        lut[tuple(_quantize(c) for c in mapped_color)] = _LUT_LABELS.index(annotation_type)
+
+    # Then the tolerance cubes, first mapping wins where they overlap.
+    for mapped_color, annotation_type in COLOR_MAPPINGS.items():
+        r, g, b = (_quantize(c) for c in mapped_color)
+        cube = lut[
+            max(r - steps, 0): r + steps + 1,
+            max(g - steps, 0): g + steps + 1,
+            max(b - steps, 0): b + steps + 1,
+        ]
+        cube[cube == _LUT_UNKNOWN] = _LUT_LABELS.index(annotation_type)
+
+    return lut
+
+
+_COLOR_LUT = _build_color_lut()
+
+# Text filters used by `is_quality_text`
+_URL_RE = re.compile(r'http|www\.|\.(?:com|org|gov|edu)|doi\.org')
+_ARTIFACTS = frozenset({'page', 'figure', 'table', 'appendix', 'section'})
+
+# Whitespace cleanup used by `extract_text_from_rect`
+_WS_RE = re.compile(r'[ \t]+')
+_NL_RE = re.compile(r'\n+')
 
-def _check_contain(r_word, points):
-    """If `r_word` is contained in the rectangular area.
+
+@dataclass(slots=True)
+class Highlight:
+    """A highlighted passage of the PDF and its metadata."""
+    page: int  # 1-based page number
+    text: str
+    color: Optional[Tuple[float, float, float]]
+    annotation_type: Optional[str]  # Def, FYI, Rec, Err, Ref or None
+    coordinates: Optional[Dict[str, float]] = None  # x0, y0, x1, y1
+    highlight_area: Optional[float] = None
+    text_length: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        """Dictionary form for JSON output, geometry fields only when set."""
+        data = {
+            "page": self.page,
+            "text": self.text,
+            "color": self.color,
+            "annotation_type": self.annotation_type,
+        }
+        if self.coordinates is not None:
+            data["coordinates"] = self.coordinates
+            data["highlight_area"] = self.highlight_area
+            data["text_length"] = self.text_length
+        return data
+
+
+class _PageWords(NamedTuple):
+    """Words of a page with their geometry, shared by all its highlights."""
+    words: List[tuple]  # as from `page.get_text("words")`
+    boxes: np.ndarray  # (N, 4) x0, y0, x1, y1 bboxes
+    areas: np.ndarray  # (N,) bbox areas
+    centers: np.ndarray  # (N, 2) bbox center points
+
+
+def _page_words(page: fitz.Page) -> _PageWords:
+    """Fetch the words of `page` and precompute their geometry."""
+    words = page.get_text("words")
+    boxes = np.array([w[:4] for w in words], dtype=np.float32).reshape(-1, 4)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    centers = (boxes[:, :2] + boxes[:, 2:]) * 0.5
+    return _PageWords(words, boxes, areas, centers)
+
+
+def _check_contain(page_words, qrect):
+    """Which words of `page_words` are contained in the rectangular area.
 
     The area of the intersection should be large enough compared to the
     area of the given word.
 
     Args:
-        r_word (fitz.Rect): rectangular area of a single word.
-        points (list): list of points in the rectangular area of the
+        page_words (_PageWords): words of the page and their geometry.
+        qrect (tuple): x0, y0, x1, y1 of the rectangular area of the
             given part of a highlight.
 
     Returns:
-        bool: whether `r_word` is contained in the rectangular area.
+        np.ndarray: boolean mask, whether each word is contained in the
+            rectangular area.
     """
-    # `r` is mutable, so everytime a new `r` should be initiated.
-    r = fitz.Quad(points).rect
-    r.intersect(r_word)
+    qx0, qy0, qx1, qy1 = qrect
+    mask = np.zeros(len(page_words.words), dtype=bool)
 
-    if r.get_area() >= r_word.get_area() * _threshold_intersection:
-        contain = True
-    else:
-        contain = False
-    return contain
+    # A word overlapping by more than half on both axes has its center inside,
+    # so the center test only drops words that cannot pass the area test.
+    cx, cy = page_words.centers[:, 0], page_words.centers[:, 1]
+    candidates = np.nonzero((cx >= qx0) & (cx <= qx1) & (cy >= qy0) & (cy <= qy1))[0]
+    if len(candidates) == 0:
+        return mask
+
+    boxes = page_words.boxes[candidates]
+    ix0 = np.maximum(boxes[:, 0], qx0)
+    iy0 = np.maximum(boxes[:, 1], qy0)
+    ix1 = np.minimum(boxes[:, 2], qx1)
+    iy1 = np.minimum(boxes[:, 3], qy1)
+    inter = np.clip(ix1 - ix0, 0, None) * np.clip(iy1 - iy0, 0, None)
 
+    mask[candidates] = inter >= page_words.areas[candidates] * _threshold_intersection
+    return mask
 
-def _extract_annot(annot, words_on_page):
+
+def _extract_annot(annot, page_words):
     """Extract words in a given highlight.
 
     Args:
-        annot (fitz.Annot): [description]
-        words_on_page (list): [description]
+        annot (fitz.Annot): the highlight annotation.
+        page_words (_PageWords): words of the page and their geometry.
 
     Returns:
         str: words in the entire highlight.
     """
     quad_points = annot.vertices
     quad_count = int(len(quad_points) / 4)
-    sentences = ['' for i in range(quad_count)]
-    for i in range(quad_count):
-        points = quad_points[i * 4: i * 4 + 4]
-        words = [
-            w for w in words_on_page if
-            _check_contain(fitz.Rect(w[:4]), points)
-        ]
-        sentences[i] = ' '.join(w[4] for w in words)
-    sentence = ' '.join(sentences)
+    # Axis-aligned bbox of every quad at once, same as `fitz.Quad(points).rect`
+    quads = np.asarray(quad_points[:quad_count * 4], dtype=np.float32).reshape(-1, 4, 2)
+    qrects = np.concatenate((quads.min(axis=1), quads.max(axis=1)), axis=1)
+    # Words in any of the quads, joined once in the page's reading order
+    mask = np.zeros(len(page_words.words), dtype=bool)
+    for qrect in qrects:
+        mask |= _check_contain(page_words, qrect)
+    sentence = ' '.join(page_words.words[j][4] for j in np.nonzero(mask)[0])
 
     return sentence
 
-def extract_pdf_highlights(pdf_path: str) -> List[Dict]:
-    """
-    Extract highlighted text from a PDF file and return as a list of dictionaries.
+def normalize_color(color: Tuple[float, ...]) -> Tuple[float, ...]:
+    """Normalize color values to a consistent format."""
+    if not color:
+        return (0.0, 0.0, 0.0)
     
-    Args:
-        pdf_path (str): Path to the PDF file
-        
-    Returns:
-        List[Dict]: List of dictionaries containing highlighted text and metadata.
-                   Each dictionary contains:
-                   - page: Page number (1-based)
-                   - text: The highlighted text
-                   - color: RGB color tuple
-                   - annotation_type: Mapped type (Def, FYI, Rec, or None)
-                   - coordinates: Dictionary with x0, y0, x1, y1 coordinates
-    """
+    # Ensure we have RGB values, spelled out for the common 3-channel case
+    n = len(color)
+    if n >= 3:
+        return (round(color[0], 2), round(color[1], 2), round(color[2], 2))
+    elif n == 1:
+        # Grayscale to RGB
+        r = round(color[0], 2)
+        return (r, r, r)
+    else:
+        return (0.0, 0.0, 0.0)
+
+
+@lru_cache(maxsize=256)
+def _map_normalized_color(normalized_color: Tuple[float, float, float]) -> Optional[str]:
+    """Map a normalized color to an annotation type, memoized per color."""
+    r, g, b = normalized_color
+    idx = _COLOR_LUT[_quantize(r), _quantize(g), _quantize(b)]
+    return _LUT_LABELS[idx] if idx != _LUT_UNKNOWN else None
+
+
+def map_color_to_type(color: Tuple[float, ...]) -> Optional[str]:
+    """Map a color to an annotation type."""
+    return _map_normalized_color(normalize_color(color))
+
+
+def is_quality_text(text: str) -> bool:
+    """Check if text is meaningful content (not URLs, page numbers, etc.)."""
+    if not text or len(text.strip()) < 2:
+        return False
     
-    # Color mappings based on TCAnnex annotation types
-    # Based on actual colors found in the PDF
-    COLOR_MAPPINGS = {
-        # Actual colors from the PDF
-        (1.0, 0.76, 0.0): "FYI",     # Gold/orange - FYI (Other important info) 
-        (0.77, 0.98, 0.45): "Def",   # Light green - Def (Definition)
-        (0.22, 0.9, 1.0): "Rec",     # Light blue - Rec (Recommendation)
-        (1.0, 0.38, 0.0): "Err",   # Red - Err (Error)
-        (0.86, 0.67, 1.0): "Ref",    # Light purple - Ref (Reference to external resource)
-        
-        # Add tolerance variants for similar colors
-        (1.0, 0.75, 0.0): "FYI",     # Gold variant
-        (1.0, 0.77, 0.0): "FYI",     # Gold variant
-        (0.97, 0.39, 0.39): "Err",   # Red variant
-        (0.76, 0.98, 0.45): "Def",   # Green variant
-        (0.78, 0.98, 0.45): "Def",   # Green variant  
-        (0.21, 0.9, 1.0): "Rec",     # Blue variant
-        (0.23, 0.9, 1.0): "Rec",     # Blue variant
-        (0.96, 0.39, 0.39): "Err",   # Red variant
-        (0.98, 0.39, 0.39): "Err",   # Red variant
-        (0.85, 0.67, 1.0): "Ref",    # Purple variant
-        (0.87, 0.67, 1.0): "Ref",    # Purple variant
-    }
+    text_lower = text.lower().strip()
     
-    def normalize_color(color: Tuple[float, ...]) -> Tuple[float, ...]:
-        """Normalize color values to a consistent format."""
-        if not color:
-            return (0.0, 0.0, 0.0)
-        
-        # Ensure we have RGB values
-        if len(color) >= 3:
-            return tuple(round(c, 2) for c in color[:3])
-        elif len(color) == 1:
-            # Grayscale to RGB
-            return (round(color[0], 2),) * 3
-        else:
-            return (0.0, 0.0, 0.0)
+    # Filter out URLs and web content
+    if _URL_RE.search(text_lower) is not None:
+        return False
     
-    def map_color_to_type(color: Tuple[float, ...]) -> Optional[str]:
-        """Map a color to an annotation type."""
-        normalized_color = normalize_color(color)
-        
-        # Direct match
-        if normalized_color in COLOR_MAPPINGS:
-            return COLOR_MAPPINGS[normalized_color]
-        
-        # Fuzzy match with tolerance
-        tolerance = 0.15
-        for mapped_color, annotation_type in COLOR_MAPPINGS.items():
-            if all(abs(c1 - c2) <= tolerance for c1, c2 in zip(normalized_color, mapped_color)):
-                return annotation_type
-        
-        return None
+    # Filter out common artifacts
+    if text_lower in _ARTIFACTS:
+        return False
+    
+    # Filter out pure numbers or minimal content
+    if text.strip().isdigit() or len(text.strip()) < 3:
+        return False
+    
+    # Check for reasonable ratio of letters to other characters
+    letters = sum(map(str.isalpha, text))
+    if len(text) > 0 and letters / len(text) < 0.3:
+        return False
+    
+    return True
 
-    def is_quality_text(text: str) -> bool:
-        """Check if text is meaningful content (not URLs, page numbers, etc.)."""
-        if not text or len(text.strip()) < 2:
-            return False
-        
-        text_lower = text.lower().strip()
-        
-        # Filter out URLs and web content
-        url_indicators = ['http', 'www.', '.com', '.org', '.gov', '.edu', 'doi.org']
-        if any(indicator in text_lower for indicator in url_indicators):
-            return False
+
+def extract_text_from_rect(page_words: _PageWords, annot: fitz.Annot) -> str:
+    """Extract text from a specific rectangle on a page with improved precision."""
+    try:
+        #Extract only the words which are highlighted, nothing more.
+        clip_text = _extract_annot(annot, page_words)
+
+        if not clip_text or not is_quality_text(clip_text):
+            return ""
         
-        # Filter out common artifacts
-        artifacts = ['page', 'figure', 'table', 'appendix', 'section']
-        if text_lower in artifacts:
-            return False
+        # Clean up the extracted text
+        # Remove excessive whitespace but preserve single spaces and line breaks
+        clean_text = _WS_RE.sub(' ', clip_text)  # Multiple spaces/tabs to single space
+        clean_text = _NL_RE.sub(' ', clean_text)  # Multiple newlines to single space
+        clean_text = clean_text.strip()
         
-        # Filter out pure numbers or minimal content
-        if text.strip().isdigit() or len(text.strip()) < 3:
-            return False
+        return clean_text
         
-        # Check for reasonable ratio of letters to other characters
-        letters = sum(1 for c in text if c.isalpha())
-        if len(text) > 0 and letters / len(text) < 0.3:
-            return False
+    except Exception as e:
+        print(f"Error extracting text from rectangle: {e}")
+        return ""
+
+
+def _extract_page(doc: fitz.Document, page_num: int, include_unknown: bool = True,
+                  include_geometry: bool = True) -> List[Highlight]:
+    """Extract the highlights of a single page, see `extract_pdf_highlights`."""
+    page_highlights = []
+    page = doc[page_num]
+    # Words are fetched once per page and shared by all its highlights
+    page_words = None
+    
+    try:
+        # Get all annotations on the page
+        annotations = page.annots()
         
-        return True
+        for annot in annotations:
+            # Check if this is a highlight annotation
+            if annot.type[0] == pymupdf.PDF_ANNOT_HIGHLIGHT:
+                # Get the highlight color
+                color = annot.colors.get("stroke") or annot.colors.get("fill")
+                
+                # Map color to annotation type, before paying for the text
+                normalized_color = normalize_color(color)
+                annotation_type = _map_normalized_color(normalized_color)
+                if annotation_type is None and not include_unknown:
+                    continue
+                
+                # Get the highlighted area
+                rect = annot.rect
+
+                # Extract the text in the highlighted area
+                if page_words is None:
+                    page_words = _page_words(page)
+                highlighted_text = extract_text_from_rect(page_words, annot)
+
+                if highlighted_text.strip():
+                    highlight = Highlight(
+                        page=page_num + 1,  # 1-based page numbering
+                        text=highlighted_text.strip(),
+                        #matthew_text=annot.get_textbox(rect).strip(),
+                        color=normalized_color if color else None,
+                        annotation_type=annotation_type,
+                    )
+                    if include_geometry:
+                        highlight.coordinates = {
+                            "x0": rect.x0,
+                            "y0": rect.y0,
+                            "x1": rect.x1,
+                            "y1": rect.y1
+                        }
+                        highlight.highlight_area = rect.width * rect.height
+                        highlight.text_length = len(highlight.text)
+                    page_highlights.append(highlight)
     
-    def extract_text_from_rect(page: fitz.Page, annot: fitz.Annot, rect: fitz.Rect) -> str:
-        """Extract text from a specific rectangle on a page with improved precision."""
-        try:
-            #Get all the word blocks in the associated rectangle. Order them by y then x coordinates
-            #word_blocks = sorted(page.get_text("words", clip=rect), key=lambda w:(w[1], w[0]))
-            word_blocks = page.get_text("words", clip=rect)
-            #Extract only the words which are highlighted, nothing more.
-            clip_text = _extract_annot(annot, word_blocks)
-
-            if not clip_text or not is_quality_text(clip_text):
-                return ""
-            
-            # Clean up the extracted text
-            import re
-            # Remove excessive whitespace but preserve single spaces and line breaks
-            clean_text = re.sub(r'[ \t]+', ' ', clip_text)  # Multiple spaces/tabs to single space
-            clean_text = re.sub(r'\n+', ' ', clean_text)    # Multiple newlines to single space
-            clean_text = clean_text.strip()
-            
-            return clean_text
-            
-        except Exception as e:
-            print(f"Error extracting text from rectangle: {e}")
-            return ""
+    except Exception as e:
+        print(f"Error processing page {page_num + 1}: {e}")
+    
+    return page_highlights
+
+
+# Document opened once per worker process, fitz documents are not picklable.
+_worker_doc = None
+
+
+def _init_worker(pdf_path: str) -> None:
+    """Pool initializer, open the PDF in the worker process."""
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path)
+
+
+def _process_page(page_num: int, include_unknown: bool = True,
+                  include_geometry: bool = True) -> List[Highlight]:
+    """Pool task, extract the highlights of one page of the worker's PDF."""
+    return _extract_page(_worker_doc, page_num, include_unknown, include_geometry)
+
+
+def _iter_doc_highlights(doc: fitz.Document, processes: Optional[int] = None,
+                         include_unknown: bool = True,
+                         include_geometry: bool = True) -> Iterator[Highlight]:
+    """Yield the highlights of an already open document, see `iter_pdf_highlights`."""
+    page_count = len(doc)
+    processes = min(processes or os.cpu_count() or 1, page_count)
+    
+    # Workers reopen the file by name, in-memory documents stay in-process
+    if processes <= 1 or doc.stream is not None or not doc.name:
+        for page_num in range(page_count):
+            yield from _extract_page(doc, page_num, include_unknown, include_geometry)
+        return
+    
+    # Pages come back in order, so the result matches the in-process path
+    process_page = partial(_process_page, include_unknown=include_unknown,
+                           include_geometry=include_geometry)
+    with Pool(processes, initializer=_init_worker, initargs=(doc.name,)) as pool:
+        for page_highlights in pool.imap(process_page, range(page_count), chunksize=8):
+            yield from page_highlights
+
+
+def iter_pdf_highlights(pdf_path: str, processes: Optional[int] = None,
+                        include_unknown: bool = True,
+                        include_geometry: bool = True) -> Iterator[Highlight]:
+    """
+    Extract highlighted text from a PDF file, yielding one highlight at a time.
+    
+    Highlights are yielded in page order as pages complete, so consumers can
+    stream them out without holding the whole document's results.
+    See `extract_pdf_highlights` for the arguments and the highlight format.
+    """
     
     # Main extraction logic
     try:
         doc = fitz.open(pdf_path)
     except Exception as e:
         print(f"Error opening PDF: {e}")
-        return []
-    
-    all_highlights = []
+        return
     
     try:
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            
-            try:
-                # Get all annotations on the page
-                annotations = page.annots()
-                
-                for annot in annotations:
-                    # Check if this is a highlight annotation
-                    if annot.type[0] == pymupdf.PDF_ANNOT_HIGHLIGHT:
-                        # Get the highlight color
-                        color = annot.colors.get("stroke") or annot.colors.get("fill")
-                        
-                        # Get the highlighted area
-                        rect = annot.rect
-
-                        # Extract the text in the highlighted area
-                        highlighted_text = extract_text_from_rect(page, annot, rect)
-
-                        if highlighted_text.strip():
-                            # Map color to annotation type
-                            annotation_type = map_color_to_type(color)
-                            
-                            highlight_data = {
-                                "page": page_num + 1,  # 1-based page numbering
-                                "text": highlighted_text.strip(),
-                                #"matthew_text": annot.get_textbox(rect).strip(),
-                                "color": normalize_color(color) if color else None,
-                                "annotation_type": annotation_type,
-                                "coordinates": {
-                                    "x0": rect.x0,
-                                    "y0": rect.y0,
-                                    "x1": rect.x1,
-                                    "y1": rect.y1
-                                },
-                                "highlight_area": rect.width * rect.height,
-                                "text_length": len(highlighted_text.strip())
-                            }
-                            all_highlights.append(highlight_data)
-            
-            except Exception as e:
-                print(f"Error processing page {page_num + 1}: {e}")
-                continue
-    
+        yield from _iter_doc_highlights(doc, processes, include_unknown, include_geometry)
     finally:
         doc.close()
+
+
+def extract_pdf_highlights(pdf_path: str, processes: Optional[int] = None,
+                           include_unknown: bool = True,
+                           include_geometry: bool = True) -> List[Highlight]:
+    """
+    Extract highlighted text from a PDF file and return as a list of highlights.
+    
+    Pages are independent, so they are processed in parallel across a pool
+    of worker processes. Use `iter_pdf_highlights` to stream the results.
     
-    return all_highlights
+    Args:
+        pdf_path (str): Path to the PDF file
+        processes (int, optional): Number of worker processes, defaults to
+            the number of CPUs. With 1 the pages are processed in-process.
+        include_unknown (bool): Whether to keep highlights whose color does
+            not map to an annotation type. When False their text is not
+            extracted at all.
+        include_geometry (bool): Whether to fill in the coordinates,
+            highlight_area and text_length fields.
+        
+    Returns:
+        List[Highlight]: List of highlights with the highlighted text and metadata.
+                   Each highlight contains:
+                   - page: Page number (1-based)
+                   - text: The highlighted text
+                   - color: RGB color tuple
+                   - annotation_type: Mapped type (Def, FYI, Rec, or None)
+                   - coordinates: Dictionary with x0, y0, x1, y1 coordinates
+                   - highlight_area: Area of the highlight rectangle
+                   - text_length: Length of the highlighted text
+                   The last three are None without `include_geometry`.
+                   Use `Highlight.to_dict` for a JSON-ready dictionary.
+    """
+    return list(iter_pdf_highlights(pdf_path, processes, include_unknown, include_geometry))
+
 
 
 
+def _doc_color_stats(doc: fitz.Document) -> Dict:
+    """Color statistics of an already open document, see `get_highlight_color_stats`."""
+    colors = (
+        annot.colors.get("stroke") or annot.colors.get("fill")
+        for page in doc
+        for annot in page.annots(types=(pymupdf.PDF_ANNOT_HIGHLIGHT,))
+    )
+    return Counter(
+        tuple(round(c, 2) for c in color[:3]) if len(color) >= 3 else (0.0, 0.0, 0.0)
+        for color in colors if color
+    )
+
 
 def get_highlight_color_stats(pdf_path: str) -> Dict:
     """
@@ -270,24 +465,10 @@ def get_highlight_color_stats(pdf_path: str) -> Dict:
         print(f"Error opening PDF: {e}")
         return {}
     
-    color_stats = {}
-    
     try:
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            annotations = page.annots()
-            
-            for annot in annotations:
-                if annot.type[1] == "Highlight":
-                    color = annot.colors.get("stroke") or annot.colors.get("fill")
-                    if color:
-                        normalized_color = tuple(round(c, 2) for c in color[:3]) if len(color) >= 3 else (0.0, 0.0, 0.0)
-                        color_stats[normalized_color] = color_stats.get(normalized_color, 0) + 1
-    
+        return _doc_color_stats(doc)
     finally:
         doc.close()
-    
-    return color_stats
 
 
 if __name__ == "__main__":
@@ -301,14 +482,23 @@ if __name__ == "__main__":
     
     pdf_path = sys.argv[1]
     
-    # Extract highlights
-    highlights = extract_pdf_highlights(pdf_path)
+    # Open the PDF once for both the highlights and the color statistics
+    try:
+        doc = fitz.open(pdf_path)
+    except Exception as e:
+        print(f"Error opening PDF: {e}")
+        sys.exit(1)
+    
+    with doc:
+        # Extract highlights
+        highlights = list(_iter_doc_highlights(doc))
+        color_stats = _doc_color_stats(doc)
     
     # Show results
     output_data = {
         "pdf_file": pdf_path,
         "total_highlights": len(highlights),
-        "highlights": highlights,
+        "highlights": [highlight.to_dict() for highlight in highlights],
         "annotation_types": {
             "Def": "Definition",
             "FYI": "Other important info", 
@@ -320,6 +510,5 @@ if __name__ == "__main__":
     
     # Also show color statistics
     print("\nColor Statistics:", file=sys.stderr)
-    color_stats = get_highlight_color_stats(pdf_path)
     for color, count in color_stats.items():
         print(f"  {color}: {count} highlights", file=sys.stderr)
\ No newline at end of file